@@ -3,7 +3,6 @@
 from __future__ import annotations
 
 import logging
-import requests
 from typing import Any
 
 import voluptuous as vol
@@ -39,6 +38,27 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
     }
 )
 
+# key, default and type of each option in the options form
+_OPTIONS: tuple[tuple[str, Any, type], ...] = (
+    (CONF_DATE_FORMAT, DEFAULT_DATE_FORMAT, str),
+    (CONF_SHOW_TOPN, DEFAULT_TOPN, int),
+    (CONF_LOCAL_TIME, False, bool),
+    (CONF_REMOVE_SUMMARY_IMG, False, bool),
+    # inclusions and exclusions are comma separated for UI simplicity
+    (CONF_INCLUSIONS, "", str),
+    (CONF_EXCLUSIONS, "", str),
+)
+
+
+def _build_options_schema(defaults: dict[str, Any]) -> vol.Schema:
+    """Return the options schema with the current values as defaults."""
+    return vol.Schema(
+        {
+            vol.Optional(key, default=defaults[key]): value_type
+            for key, _, value_type in _OPTIONS
+        }
+    )
+
 
 class FeedparserConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Feedparser."""
@@ -55,6 +75,8 @@ class FeedparserConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 # Basic validation: check if the URL is reachable
                 # Use a timeout to avoid hanging the UI
                 def validate_url():
+                    import requests
+
                     headers = {
                         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
                         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
@@ -116,30 +138,11 @@ class FeedparserOptionsFlowHandler(config_entries.OptionsFlow):
                 return ", ".join([str(v) for v in val])
             return val if val is not None else default
 
+        defaults = {
+            key: value_type(get_val(key, default))
+            for key, default, value_type in _OPTIONS
+        }
         return self.async_show_form(
             step_id="init",
-            data_schema=vol.Schema(
-                {
-                    vol.Optional(
-                        CONF_DATE_FORMAT,
-                        default=get_val(CONF_DATE_FORMAT, DEFAULT_DATE_FORMAT),
-                    ): str,
-                    vol.Optional(
-                        CONF_SHOW_TOPN, default=int(get_val(CONF_SHOW_TOPN, DEFAULT_TOPN))
-                    ): int,
-                    vol.Optional(
-                        CONF_LOCAL_TIME, default=bool(get_val(CONF_LOCAL_TIME, False))
-                    ): bool,
-                    vol.Optional(
-                        CONF_REMOVE_SUMMARY_IMG,
-                        default=bool(get_val(CONF_REMOVE_SUMMARY_IMG, False)),
-                    ): bool,
-                    vol.Optional(
-                        CONF_INCLUSIONS, default=get_val(CONF_INCLUSIONS, "")
-                    ): str,  # Comma separated for UI simplicity
-                    vol.Optional(
-                        CONF_EXCLUSIONS, default=get_val(CONF_EXCLUSIONS, "")
-                    ): str,  # Comma separated for UI simplicity
-                }
-            ),
+            data_schema=_build_options_schema(defaults),
         )
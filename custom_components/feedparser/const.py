@@ -15,5 +15,7 @@ CONF_REMOVE_SUMMARY_IMG = "remove_summary_image"
 DEFAULT_DATE_FORMAT = "%a, %b %d %Y %I:%M %p"
 DEFAULT_SCAN_INTERVAL = timedelta(hours=1)
 DEFAULT_TOPN = 9999
+MAX_CACHE_LIFETIME = timedelta(days=1)
+RETRY_INTERVAL = timedelta(seconds=60)
 
 IMAGE_REGEX = r"<img.+?src=\"(.+?)\".+?>"
@@ -3,22 +3,25 @@
 from __future__ import annotations
 
 import email.utils
+import hashlib
 import logging
 import re
 from datetime import datetime, timedelta, timezone
+from functools import cache
+from http import HTTPStatus
+from itertools import islice
+from operator import methodcaller
 from typing import TYPE_CHECKING, Any
 from urllib.parse import urljoin
 
-import feedparser  # type: ignore[import]
 import homeassistant.helpers.config_validation as cv
 import requests
 import voluptuous as vol
-from dateutil import parser
-from feedparser import FeedParserDict
 from homeassistant.components.sensor import PLATFORM_SCHEMA, SensorEntity
 from homeassistant.const import CONF_NAME, CONF_SCAN_INTERVAL
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_call_later
 from homeassistant.util import dt
-from requests_file import FileAdapter
 
 from .const import (
     CONF_DATE_FORMAT,
@@ -33,16 +36,25 @@ from .const import (
     DEFAULT_TOPN,
     DOMAIN,
     IMAGE_REGEX,
+    MAX_CACHE_LIFETIME,
+    RETRY_INTERVAL,
 )
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from dateutil import parser
+    from feedparser import FeedParserDict  # type: ignore[import]
     from homeassistant.config_entries import ConfigEntry
-    from homeassistant.core import HomeAssistant
+    from homeassistant.core import CALLBACK_TYPE, HomeAssistant
     from homeassistant.helpers.entity_platform import AddEntitiesCallback
     from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
 
 __version__ = "1.0.5"
 
+# sensors poll in executor threads, don't serialize updates of different feeds
+PARALLEL_UPDATES = 0
+REQUEST_TIMEOUT = 30
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 
 PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend(
@@ -61,6 +73,28 @@ PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend(
 
 _LOGGER: logging.Logger = logging.getLogger(__name__)
 
+_MAX_AGE_RE = re.compile(r"\bmax-age=(\d+)")
+_IMAGE_RE = re.compile(IMAGE_REGEX, re.S)
+_IMAGE_SUB_RE = re.compile(IMAGE_REGEX)
+_DATE_KEYS = frozenset(("published", "updated", "created", "expired"))
+_VALUE_TYPES = (dict, list, str, int, float, bool)
+# exact-type lookup for the common case, subclasses like FeedParserDict fall
+# back to isinstance()
+_PLAIN_VALUE_TYPES = frozenset(_VALUE_TYPES)
+# xml:base as it appears in ASCII compatible, UTF-16 and UTF-32 documents
+_XML_BASE_MARKERS = tuple(
+    "xml:base".encode(encoding)
+    for encoding in ("utf-8", "utf-16-le", "utf-16-be", "utf-32-le", "utf-32-be")
+)
+_INVALID_URL_ERRORS = (
+    requests.exceptions.InvalidSchema,
+    requests.exceptions.InvalidURL,
+    requests.exceptions.MissingSchema,
+)
+_TRANSIENT_CLIENT_ERRORS = frozenset(
+    (HTTPStatus.REQUEST_TIMEOUT, HTTPStatus.TOO_MANY_REQUESTS),
+)
+
 
 async def async_setup_platform(
     hass: HomeAssistant,  # noqa: ARG001
@@ -127,6 +161,59 @@ async def async_setup_entry(
     )
 
 
+def _build_key_filter(
+    inclusions: frozenset[str | None] | None,
+    exclusions: frozenset[str | None],
+) -> Callable[[str], bool]:
+    """Return a predicate telling whether a feed key should be skipped."""
+
+    def skip_key(key: str) -> bool:
+        return (
+            (inclusions is not None and key not in inclusions)
+            or key in exclusions
+            or key == "detail"
+            or key.endswith("_detail")
+            or "parsed" in key
+        )
+
+    return skip_key
+
+
+def _is_transient_error(error: requests.RequestException) -> bool:
+    """Return whether a failed fetch is worth retrying early."""
+    # a malformed feed URL won't fix itself before the next scan interval
+    if isinstance(error, _INVALID_URL_ERRORS):
+        return False
+    # connection errors, timeouts and interrupted bodies carry no response
+    if error.response is None:
+        return True
+    status = error.response.status_code
+    return (
+        status >= HTTPStatus.INTERNAL_SERVER_ERROR or status in _TRANSIENT_CLIENT_ERRORS
+    )
+
+
+def _parse_http_date(value: str | None) -> datetime | None:
+    """Return the datetime of an HTTP date header or None if it is invalid."""
+    if not value:
+        return None
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (ValueError, TypeError):
+        return None
+    if not parsed.tzinfo:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+@cache
+def _dateutil_parser() -> parser.parser:
+    """Return a shared dateutil parser, importing dateutil on first use."""
+    from dateutil import parser
+
+    return parser.parser()
+
+
 class FeedParserSensor(SensorEntity):
     """Representation of a Feedparser sensor."""
 
@@ -151,14 +238,46 @@ class FeedParserSensor(SensorEntity):
         self._attr_name = name
         self._attr_icon = "mdi:rss"
         self._date_format = date_format
+        self._fmt_date: Callable[[datetime], str] = methodcaller(
+            "strftime",
+            date_format,
+        )
         self._show_topn: int = show_topn
         self._remove_summary_image = remove_summary_image
-        self._inclusions = inclusions
-        self._exclusions = exclusions
+        self._inclusions: frozenset[str | None] | None = (
+            frozenset(inclusions) if inclusions else None
+        )
+        self._exclusions: frozenset[str | None] = frozenset(exclusions)
+        self._skip_key = _build_key_filter(self._inclusions, self._exclusions)
         self._scan_interval = scan_interval
         self._local_time = local_time
         self._channel: dict[str, str] = {}
         self._entries: list[dict[str, str]] = []
+        self._etag: str | None = None
+        self._last_modified: str | None = None
+        self._fresh_until: datetime | None = None
+        self._last_body_hash: bytes | None = None
+        self._unsub_retry: CALLBACK_TYPE | None = None
+        self._is_retry = False
+        # keep one session per sensor so polls reuse the pooled connection
+        self._session: requests.Session = requests.Session()
+        if feed.startswith("file://"):
+            from requests_file import FileAdapter
+
+            self._session.mount("file://", FileAdapter())
+        self._session.headers.update(
+            {
+                "User-Agent": USER_AGENT,
+                "Accept": "*/*",
+                "Accept-Language": "en-US,en;q=0.9",
+                "Accept-Encoding": "gzip, deflate, br",
+                "Sec-Fetch-Dest": "document",
+                "Sec-Fetch-Mode": "navigate",
+                "Sec-Fetch-Site": "same-origin",
+                "Sec-Fetch-User": "?1",
+                "Upgrade-Insecure-Requests": "1",
+            },
+        )
         self._attr_attribution = "Data retrieved using RSS feedparser"
         if entry_id:
             self._attr_unique_id = f"{entry_id}"
@@ -175,26 +294,116 @@ class FeedParserSensor(SensorEntity):
             f'local_time={self._local_time}, date_format="{self._date_format}")'
         )
 
+    async def async_will_remove_from_hass(self: FeedParserSensor) -> None:
+        """Cancel a pending retry and close the HTTP session."""
+        if self._unsub_retry:
+            self._unsub_retry()
+            self._unsub_retry = None
+        await self.hass.async_add_executor_job(self._session.close)
+
+    @callback
+    def _async_schedule_retry(self: FeedParserSensor) -> None:
+        """Schedule an early update after a failed fetch."""
+        if self._unsub_retry:
+            self._unsub_retry()
+        self._unsub_retry = async_call_later(
+            self.hass,
+            RETRY_INTERVAL,
+            self._async_retry,
+        )
+
+    @callback
+    def _async_retry(self: FeedParserSensor, _now: datetime) -> None:
+        """Update the sensor again after a failed fetch."""
+        self._unsub_retry = None
+        self._is_retry = True
+        self.async_schedule_update_ha_state(force_refresh=True)
+
+    def _fetch(self: FeedParserSensor, is_retry: bool) -> bytes | None:
+        """Return the feed body or None if there is no new body to parse."""
+        _LOGGER.debug("Feed %s: Polling feed data from %s", self.name, self._feed)
+        # send the validators of the last response so the server can reply
+        # with 304 Not Modified instead of the full feed body
+        headers: dict[str, str] = {}
+        if self._etag:
+            headers["If-None-Match"] = self._etag
+        if self._last_modified:
+            headers["If-Modified-Since"] = self._last_modified
+        # stream the response so that error and 304 responses are checked
+        # before any body is downloaded
+        try:
+            with self._session.get(
+                self._feed,
+                headers=headers,
+                timeout=REQUEST_TIMEOUT,
+                stream=True,
+            ) as res:
+                res.raise_for_status()
+                if res.status_code == HTTPStatus.NOT_MODIFIED:
+                    self._fresh_until = self._cache_expiry(res)
+                    _LOGGER.debug(
+                        "Feed %s: Feed not modified since last update, "
+                        "keeping entries",
+                        self.name,
+                    )
+                    return None
+                content: bytes = res.content
+                # only trust the cache headers once the body has been read
+                self._fresh_until = self._cache_expiry(res)
+                self._etag = res.headers.get("ETag")
+                self._last_modified = res.headers.get("Last-Modified")
+        except requests.RequestException as e:
+            # serve the stale entries, transient errors get one early retry
+            # per scan interval
+            if is_retry or not _is_transient_error(e):
+                _LOGGER.warning(
+                    "Feed %s: Unable to fetch feed: %s. Keeping the previous "
+                    "entries.",
+                    self.name,
+                    e,
+                )
+                return None
+            _LOGGER.warning(
+                "Feed %s: Unable to fetch feed: %s. Keeping the previous entries "
+                "and retrying in %s.",
+                self.name,
+                e,
+                RETRY_INTERVAL,
+            )
+            self.hass.loop.call_soon_threadsafe(self._async_schedule_retry)
+            return None
+        return content
+
     def update(self: FeedParserSensor) -> None:
         """Parse the feed and update the state of the sensor."""
-        _LOGGER.debug("Feed %s: Polling feed data from %s", self.name, self._feed)
-        s: requests.Session = requests.Session()
-        s.mount("file://", FileAdapter())
-        headers = {
-            "User-Agent": USER_AGENT,
-            "Accept": "*/*",
-            "Accept-Language": "en-US,en;q=0.9",
-            "Accept-Encoding": "gzip, deflate, br",
-            "Sec-Fetch-Dest": "document",
-            "Sec-Fetch-Mode": "navigate",
-            "Sec-Fetch-Site": "same-origin",
-            "Sec-Fetch-User": "?1",
-            "Upgrade-Insecure-Requests": "1",
-        }
-        s.headers.update(headers)
-        res: requests.Response = s.get(self._feed)
-        res.raise_for_status()
-        parsed_feed: FeedParserDict = feedparser.parse(res.content)
+        is_retry, self._is_retry = self._is_retry, False
+        if self._fresh_until and dt.utcnow() < self._fresh_until:
+            _LOGGER.debug(
+                "Feed %s: Cached feed is fresh until %s, skipping poll",
+                self.name,
+                self._fresh_until,
+            )
+            return
+        if (content := self._fetch(is_retry)) is None:
+            return
+        # servers without validators often still return a bit-identical body
+        body_hash = hashlib.blake2b(content, digest_size=16).digest()
+        if body_hash == self._last_body_hash:
+            _LOGGER.debug(
+                "Feed %s: Feed content unchanged since last update, keeping entries",
+                self.name,
+            )
+            return
+        self._last_body_hash = body_hash
+        import feedparser  # type: ignore[import]
+
+        # the body is parsed without its URL, so relative URIs in HTML fields
+        # can only be resolved against an xml:base in the document; skip that
+        # pass over every HTML field when there is none in any encoding
+        parsed_feed: FeedParserDict = feedparser.parse(
+            content,
+            resolve_relative_uris=any(m in content for m in _XML_BASE_MARKERS),
+        )
 
         self._channel.clear()
         self._entries.clear()
@@ -230,38 +439,82 @@ class FeedParserSensor(SensorEntity):
             len(self.feed_entries),
         )
 
+    def _cache_expiry(
+        self: FeedParserSensor,
+        res: requests.Response,
+    ) -> datetime | None:
+        """Return until when the response is fresh according to its cache headers."""
+        cache_control = res.headers.get("Cache-Control", "").lower()
+        if "no-cache" in cache_control or "no-store" in cache_control:
+            return None
+        now = dt.utcnow()
+        if match := _MAX_AGE_RE.search(cache_control):
+            lifetime = int(match.group(1))
+        elif expires := res.headers.get("Expires"):
+            if (expires_at := _parse_http_date(expires)) is None:
+                _LOGGER.debug(
+                    "Feed %s: Ignoring invalid Expires header '%s'",
+                    self.name,
+                    expires,
+                )
+                return None
+            # measure against the server's Date so local clock skew doesn't
+            # stretch or cut the lifetime
+            date = _parse_http_date(res.headers.get("Date")) or now
+            lifetime = (expires_at - date).total_seconds()
+        else:
+            return None
+        # the response may already have spent part of its lifetime in a cache
+        try:
+            lifetime -= max(int(res.headers.get("Age", 0)), 0)
+        except ValueError:
+            _LOGGER.debug(
+                "Feed %s: Ignoring invalid Age header '%s'",
+                self.name,
+                res.headers["Age"],
+            )
+        if lifetime <= 0:
+            return None
+        # clamp before building the timedelta, huge max-age values overflow it
+        return now + timedelta(
+            seconds=min(lifetime, MAX_CACHE_LIFETIME.total_seconds()),
+        )
+
     def _generate_entries(
         self: FeedParserSensor,
         parsed_feed: FeedParserDict,
     ) -> list[dict[str, str]]:
         return [
             self._generate_sensor_entry(feed_entry)
-            for feed_entry in parsed_feed.entries[
-                : self.native_value  # type: ignore[misc]
-            ]
+            for feed_entry in islice(
+                parsed_feed.entries,
+                self.native_value,  # type: ignore[arg-type]
+            )
         ]
 
     def _generate_sensor_entry(
         self: FeedParserSensor,
         feed_entry: FeedParserDict,
     ) -> dict[str, str]:
-        _LOGGER.debug("Feed %s: Generating sensor entry for %s", self.name, feed_entry)
+        _LOGGER.debug(
+            "Feed %s: Generating sensor entry for %s",
+            self.name,
+            feed_entry.get("title"),
+        )
         sensor_entry = {}
+        # bind the per-key helpers to locals for the hot loop below
+        skip_key = self._skip_key
+        parse_date = self._parse_date
+        fmt_date = self._fmt_date
         for key, value in feed_entry.items():
-            if (
-                (self._inclusions and key not in self._inclusions)
-                or ("parsed" in key)
-                or (key.endswith("_detail") or key == "detail")
-                or (key in self._exclusions)
-            ):
+            if skip_key(key):
                 continue
-            if key in ["published", "updated", "created", "expired"]:
-                parsed_date: datetime = self._parse_date(value)
-                sensor_entry[key] = parsed_date.strftime(self._date_format)
+            if key in _DATE_KEYS:
+                sensor_entry[key] = fmt_date(parse_date(value))
             elif key == "image":
                 if href := value.get("href"):
                     sensor_entry["image"] = urljoin(self._feed, href)
-            elif isinstance(value, (dict, list, str, int, float, bool)):
+            elif type(value) in _PLAIN_VALUE_TYPES or isinstance(value, _VALUE_TYPES):
                 sensor_entry[key] = value
 
         if (
@@ -283,11 +536,7 @@ class FeedParserSensor(SensorEntity):
         ):
             sensor_entry["link"] = processed_link
         if self._remove_summary_image and "summary" in sensor_entry:
-            sensor_entry["summary"] = re.sub(
-                IMAGE_REGEX,
-                "",
-                sensor_entry["summary"],
-            )
+            sensor_entry["summary"] = _IMAGE_SUB_RE.sub("", sensor_entry["summary"])
         _LOGGER.debug("Feed %s: Generated sensor entry: %s", self.name, sensor_entry)
         return sensor_entry
 
@@ -295,30 +544,26 @@ class FeedParserSensor(SensorEntity):
         self: FeedParserSensor,
         feed_info: FeedParserDict,
     ) -> dict[str, str]:
-        _LOGGER.debug("Feed %s: Generating channel info for %s", self.name, feed_info)
+        _LOGGER.debug(
+            "Feed %s: Generating channel info for %s",
+            self.name,
+            feed_info.get("title"),
+        )
         channel_info = {}
+        skip_key = self._skip_key
+        parse_date = self._parse_date
+        fmt_date = self._fmt_date
         for key, value in feed_info.items():
-            if (
-                (self._inclusions and key not in self._inclusions)
-                or ("parsed" in key)
-                or (key.endswith("_detail") or key == "detail")
-                or (key in self._exclusions)
-                or (key == "image")
-            ):
+            if skip_key(key) or key == "image":
                 continue
-            if key in ["published", "updated", "created", "expired"]:
-                parsed_date: datetime = self._parse_date(value)
-                channel_info[key] = parsed_date.strftime(self._date_format)
-            elif isinstance(value, (dict, list, str, int, float, bool)):
+            if key in _DATE_KEYS:
+                channel_info[key] = fmt_date(parse_date(value))
+            elif type(value) in _PLAIN_VALUE_TYPES or isinstance(value, _VALUE_TYPES):
                 channel_info[key] = value
 
         if "image" not in self._exclusions:
-            image_url = feed_info.get("image", {}).get("href") or feed_info.get(
-                "image",
-                {},
-            ).get("url")
-            if not image_url and feed_info.get("logo"):
-                image_url = feed_info.logo
+            image = feed_info.get("image") or {}
+            image_url = image.get("href") or image.get("url") or feed_info.get("logo")
             if image_url:
                 channel_info["image"] = urljoin(self._feed, image_url)
         _LOGGER.debug("Feed %s: Generated channel info: %s", self.name, channel_info)
@@ -332,22 +577,27 @@ class FeedParserSensor(SensorEntity):
                 (
                     "Feed %s: Unable to parse RFC-822 date from '%s'. This could be "
                     "caused by an incorrect pubDate format in the RSS feed. "
-                    "Trying to use dateutil."
+                    "Trying ISO 8601 and dateutil."
                 ),
                 self.name,
                 date,
             )
             try:
-                parsed_time = parser.parse(date)
-            except (parser.ParserError, TypeError) as e:
-                _LOGGER.warning(
-                    "Feed %s: Unable to parse date '%s' with dateutil: %s. "
-                    "Using current time as fallback.",
-                    self.name,
-                    date,
-                    e,
-                )
-                parsed_time = dt.utcnow()
+                parsed_time = datetime.fromisoformat(date)
+            except (ValueError, TypeError):
+                from dateutil import parser
+
+                try:
+                    parsed_time = _dateutil_parser().parse(date)
+                except (parser.ParserError, TypeError) as e:
+                    _LOGGER.warning(
+                        "Feed %s: Unable to parse date '%s' with dateutil: %s. "
+                        "Using current time as fallback.",
+                        self.name,
+                        date,
+                        e,
+                    )
+                    parsed_time = dt.utcnow()
 
         if not parsed_time.tzinfo:
             _LOGGER.debug(
@@ -388,18 +638,14 @@ class FeedParserSensor(SensorEntity):
                 url = enc.get("href") or enc.get("url")
                 if url and (enc.get("type") or "").startswith("image/"):
                     return url
-        if "summary" in feed_entry:
-            images = re.findall(
-                IMAGE_REGEX,
-                feed_entry["summary"],
-                re.S,
-            )
-            if images:
-                return images[0]
+        if "summary" in feed_entry and (
+            image := _IMAGE_RE.search(feed_entry["summary"])
+        ):
+            return image.group(1)
         _LOGGER.debug(
             "Feed %s: Image is in inclusions, but no image was found for %s",
             self.name,
-            feed_entry,
+            feed_entry.get("title"),
         )
         return None
 
@@ -431,7 +677,7 @@ class FeedParserSensor(SensorEntity):
                 _LOGGER.debug(
                     "Feed %s: More than one link found for %s. Using the first link.",
                     self.name,
-                    feed_entry,
+                    feed_entry.get("title"),
                 )
             return feed_entry["links"][0]["href"]
         return ""
@@ -459,6 +705,11 @@ class FeedParserSensor(SensorEntity):
     def local_time(self: FeedParserSensor, value: bool) -> None:
         """Set local_time."""
         self._local_time = value
+        # cached entries were formatted with the old setting, force a refetch
+        self._etag = None
+        self._last_modified = None
+        self._fresh_until = None
+        self._last_body_hash = None
 
     @property
     def extra_state_attributes(self: FeedParserSensor) -> dict[str, Any]:
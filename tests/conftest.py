@@ -1,5 +1,6 @@
 """Pytest configuration."""
 
+import feedparser
 import pytest
 from constants import TEST_FEEDS
 from feedsource import FeedSource
@@ -51,3 +52,17 @@ def feed_with_image_in_summary(
 ) -> FeedSource:
     """Return feed sensor with images in summary of its entries."""
     return request.param
+
+
+@pytest.fixture()
+def parse_calls(monkeypatch: pytest.MonkeyPatch) -> list[tuple]:
+    """Record the arguments of every feedparser.parse call."""
+    calls: list[tuple] = []
+    parse = feedparser.parse
+
+    def counting_parse(*args: object, **kwargs: object) -> feedparser.FeedParserDict:
+        calls.append(args)
+        return parse(*args, **kwargs)
+
+    monkeypatch.setattr(feedparser, "parse", counting_parse)
+    return calls
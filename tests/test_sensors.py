@@ -1,19 +1,25 @@
 """ "Tests the feedparser sensor."""
 
+import io
 import re
 from contextlib import nullcontext, suppress
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import TYPE_CHECKING
 from pathlib import Path
+from unittest.mock import MagicMock
 
 import feedparser
 import pytest
+import requests
 from constants import DATE_FORMAT
 from feedsource import FeedSource
 
+from homeassistant.util import dt
+
 from custom_components.feedparser.sensor import (
     DEFAULT_SCAN_INTERVAL,
     IMAGE_REGEX,
+    MAX_CACHE_LIFETIME,
     FeedParserSensor,
 )
 
@@ -21,6 +27,28 @@ if TYPE_CHECKING:
     import time
 
 
+def _response(
+    status_code: int,
+    headers: dict[str, str] | None = None,
+    body: bytes = b"",
+) -> requests.Response:
+    """Return a response as returned by a streamed session request."""
+    res = requests.Response()
+    res.status_code = status_code
+    res.headers.update(headers or {})
+    res.raw = io.BytesIO(body)
+    return res
+
+
+class _InterruptedBody(io.BytesIO):
+    """Response body whose connection drops while it is read."""
+
+    def read(self: "_InterruptedBody", *_args: object) -> bytes:
+        """Raise like a connection closed in the middle of the body."""
+        msg = "Connection broken"
+        raise requests.exceptions.ChunkedEncodingError(msg)
+
+
 def test_simple(feed_sensor: FeedParserSensor) -> None:
     """Test simple."""
     feed_sensor.update()
@@ -171,6 +199,258 @@ def test_check_duplicates(feed_sensor: FeedParserSensor) -> None:
     assert after_first_update == after_second_update
 
 
+def test_unchanged_feed_is_not_parsed_again(
+    feed_sensor: FeedParserSensor,
+    parse_calls: list[tuple],
+) -> None:
+    """Test that an unchanged feed body is not parsed on the next update."""
+    feed_sensor.update()
+    entries = list(feed_sensor.feed_entries)
+    feed_sensor.update()
+    assert len(parse_calls) == 1
+    assert feed_sensor.feed_entries == entries
+
+
+def test_conditional_get(
+    feed: FeedSource,
+    feed_sensor: FeedParserSensor,
+    monkeypatch: pytest.MonkeyPatch,
+    parse_calls: list[tuple],
+) -> None:
+    """Test that validators are sent and a 304 keeps the entries unparsed."""
+    last_modified = "Mon, 06 Nov 2023 10:15:00 GMT"
+    responses = [
+        _response(
+            200,
+            {"ETag": '"v1"', "Last-Modified": last_modified},
+            feed.path.read_bytes(),
+        ),
+        _response(304),
+    ]
+    sent_headers = []
+
+    def get(_url: str, headers: dict[str, str], **_kwargs: object) -> requests.Response:
+        sent_headers.append(headers)
+        return responses.pop(0)
+
+    monkeypatch.setattr(feed_sensor._session, "get", get)  # noqa: SLF001
+
+    feed_sensor.update()
+    entries = list(feed_sensor.feed_entries)
+    channel = dict(feed_sensor.channel)
+    assert entries
+    assert "If-None-Match" not in sent_headers[0]
+    assert "If-Modified-Since" not in sent_headers[0]
+
+    feed_sensor.update()
+    assert sent_headers[1]["If-None-Match"] == '"v1"'
+    assert sent_headers[1]["If-Modified-Since"] == last_modified
+    assert len(parse_calls) == 1
+    assert feed_sensor.feed_entries == entries
+    assert feed_sensor.channel == channel
+
+
+@pytest.mark.parametrize(
+    ("headers", "lifetime"),
+    [
+        ({}, None),
+        ({"Cache-Control": "public, max-age=600"}, timedelta(seconds=600)),
+        ({"Cache-Control": "max-age=99999999999999"}, MAX_CACHE_LIFETIME),
+        ({"Cache-Control": "s-maxage=600"}, None),
+        ({"Cache-Control": "no-cache, max-age=600"}, None),
+        ({"Cache-Control": "no-store"}, None),
+        ({"Cache-Control": "max-age=0"}, None),
+        ({"Expires": "Thu, 01 Jan 1970 00:00:00 GMT"}, None),
+        ({"Expires": "invalid"}, None),
+        (
+            {"Cache-Control": "max-age=600", "Age": "599"},
+            timedelta(seconds=1),
+        ),
+        ({"Cache-Control": "max-age=600", "Age": "600"}, None),
+        ({"Cache-Control": "max-age=600", "Age": "invalid"}, timedelta(seconds=600)),
+        (
+            {
+                "Date": "Mon, 06 Nov 2023 10:00:00 GMT",
+                "Expires": "Mon, 06 Nov 2023 12:00:00 GMT",
+            },
+            timedelta(hours=2),
+        ),
+    ],
+    ids=[
+        "no_headers",
+        "max_age",
+        "max_age_overflow",
+        "s_maxage_only",
+        "no_cache",
+        "no_store",
+        "max_age_zero",
+        "expires_past",
+        "expires_invalid",
+        "age",
+        "age_exceeds_max_age",
+        "age_invalid",
+        "expires_from_date",
+    ],
+)
+def test_cache_expiry(
+    feed_sensor: FeedParserSensor,
+    headers: dict[str, str],
+    lifetime: timedelta | None,
+) -> None:
+    """Test the freshness lifetime read from the cache headers."""
+    before = dt.utcnow()
+    expiry = feed_sensor._cache_expiry(_response(200, headers))  # noqa: SLF001
+    if lifetime is None:
+        assert expiry is None
+    else:
+        assert before + lifetime <= expiry <= dt.utcnow() + lifetime
+
+
+def test_cache_expiry_expires(feed_sensor: FeedParserSensor) -> None:
+    """Test that the Expires header is used without max-age."""
+    expires = dt.utcnow().replace(microsecond=0) + timedelta(hours=2)
+    headers = {"Expires": expires.strftime("%a, %d %b %Y %H:%M:%S GMT")}
+    assert feed_sensor._cache_expiry(_response(200, headers)) == expires  # noqa: SLF001
+
+
+def test_fresh_feed_is_not_fetched(
+    feed_sensor: FeedParserSensor,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that no request is made while the cached feed is fresh."""
+    feed_sensor.update()
+    entries = list(feed_sensor.feed_entries)
+    feed_sensor._fresh_until = dt.utcnow() + timedelta(hours=1)  # noqa: SLF001
+
+    def get(*_args: object, **_kwargs: object) -> requests.Response:
+        pytest.fail("Feed fetched while still fresh")
+
+    monkeypatch.setattr(feed_sensor._session, "get", get)  # noqa: SLF001
+    feed_sensor.update()
+    assert feed_sensor.feed_entries == entries
+
+
+def test_failed_fetch_keeps_entries(feed_sensor: FeedParserSensor) -> None:
+    """Test that the sensor keeps its entries when the feed cannot be fetched."""
+    feed_sensor.update()
+    entries = list(feed_sensor.feed_entries)
+    channel = dict(feed_sensor.channel)
+    assert entries
+
+    missing_feed = Path(__file__).parent / "data/missing_feed.xml"
+    feed_sensor._feed = missing_feed.absolute().as_uri()  # noqa: SLF001
+    feed_sensor.update()
+    assert feed_sensor.feed_entries == entries
+    assert feed_sensor.channel == channel
+
+
+def test_interrupted_body_is_not_cached(
+    feed: FeedSource,
+    feed_sensor: FeedParserSensor,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that a body that failed to download does not mark the feed fresh."""
+    feed_sensor.hass = MagicMock()
+    headers = {"Cache-Control": "max-age=86400", "ETag": '"v1"'}
+    interrupted = _response(200, headers)
+    interrupted.raw = _InterruptedBody()
+    responses = [interrupted, _response(200, headers, feed.path.read_bytes())]
+    sent_headers = []
+
+    def get(_url: str, headers: dict[str, str], **_kwargs: object) -> requests.Response:
+        sent_headers.append(headers)
+        return responses.pop(0)
+
+    monkeypatch.setattr(feed_sensor._session, "get", get)  # noqa: SLF001
+    feed_sensor.update()
+    assert not feed_sensor.feed_entries
+    assert feed_sensor._fresh_until is None  # noqa: SLF001
+
+    feed_sensor.update()
+    assert len(sent_headers) == 2  # noqa: PLR2004
+    assert "If-None-Match" not in sent_headers[1]
+    assert feed_sensor.feed_entries
+
+
+def test_failed_fetch_retries_once(
+    feed_sensor: FeedParserSensor,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that a failed fetch schedules a single early retry."""
+    hass = MagicMock()
+    feed_sensor.hass = hass
+    schedule_update = MagicMock()
+    monkeypatch.setattr(feed_sensor, "async_schedule_update_ha_state", schedule_update)
+
+    def get(*_args: object, **_kwargs: object) -> requests.Response:
+        msg = "Feed host unreachable"
+        raise requests.ConnectionError(msg)
+
+    monkeypatch.setattr(feed_sensor._session, "get", get)  # noqa: SLF001
+    feed_sensor.update()
+    hass.loop.call_soon_threadsafe.assert_called_once_with(
+        feed_sensor._async_schedule_retry,  # noqa: SLF001
+    )
+
+    # the early retry fails as well and does not schedule another one
+    feed_sensor._async_retry(dt.utcnow())  # noqa: SLF001
+    schedule_update.assert_called_once_with(force_refresh=True)
+    feed_sensor.update()
+    assert hass.loop.call_soon_threadsafe.call_count == 1
+
+    # the next regular poll may retry early again
+    feed_sensor.update()
+    assert hass.loop.call_soon_threadsafe.call_count == 2  # noqa: PLR2004
+
+
+@pytest.mark.parametrize(
+    ("status_code", "retried"),
+    [(401, False), (404, False), (410, False), (429, True), (503, True)],
+)
+def test_failed_fetch_retry_status(
+    feed_sensor: FeedParserSensor,
+    monkeypatch: pytest.MonkeyPatch,
+    status_code: int,
+    retried: bool,
+) -> None:
+    """Test that only transient HTTP errors are retried early."""
+    hass = MagicMock()
+    feed_sensor.hass = hass
+    monkeypatch.setattr(
+        feed_sensor._session,  # noqa: SLF001
+        "get",
+        lambda *_args, **_kwargs: _response(status_code),
+    )
+    feed_sensor.update()
+    assert hass.loop.call_soon_threadsafe.called is retried
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        requests.exceptions.InvalidSchema,
+        requests.exceptions.InvalidURL,
+        requests.exceptions.MissingSchema,
+    ],
+)
+def test_invalid_url_is_not_retried(
+    feed_sensor: FeedParserSensor,
+    monkeypatch: pytest.MonkeyPatch,
+    error: type[requests.RequestException],
+) -> None:
+    """Test that a malformed feed URL does not get an early retry."""
+    hass = MagicMock()
+    feed_sensor.hass = hass
+
+    def get(*_args: object, **_kwargs: object) -> requests.Response:
+        msg = "Invalid feed URL"
+        raise error(msg)
+
+    monkeypatch.setattr(feed_sensor._session, "get", get)  # noqa: SLF001
+    feed_sensor.update()
+    hass.loop.call_soon_threadsafe.assert_not_called()
+
+
 def test_remove_summary_image(
     feed_with_image_in_summary: FeedSource,
 ) -> None:
@@ -233,3 +513,61 @@ def test_media_thumbnail_support() -> None:
 
     # Check the first image url
     assert feed_sensor.feed_entries[0]["image"].startswith("https://")
+
+
+@pytest.mark.parametrize(
+    "date",
+    [
+        "Mon, 06 Nov 2023 10:15:00 +0000",
+        "2023-11-06T10:15:00Z",
+        "2023-11-06T11:15:00+01:00",
+        "November 6, 2023 10:15 UTC",
+    ],
+    ids=["rfc822", "iso8601_utc", "iso8601_offset", "dateutil"],
+)
+def test_parse_date(feed_sensor: FeedParserSensor, date: str) -> None:
+    """Test that RFC-822, ISO 8601 and free-form dates are parsed."""
+    feed_sensor.local_time = False
+    assert feed_sensor._parse_date(date) == datetime(  # noqa: SLF001
+        2023, 11, 6, 10, 15, tzinfo=timezone.utc
+    )
+
+
+@pytest.mark.parametrize("encoding", ["utf-8", "utf-16", "utf-32"])
+def test_xml_base_is_resolved(tmp_path: Path, encoding: str) -> None:
+    """Test that relative URIs in summaries are resolved against xml:base."""
+    feed_path = tmp_path / "xml_base.xml"
+    feed_path.write_text(
+        f"""<?xml version="1.0" encoding="{encoding}"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xml:base="https://cdn.example.org/blog/">
+  <title>xml:base feed</title>
+  <id>urn:example:feed</id>
+  <updated>2023-11-06T10:15:00Z</updated>
+  <entry>
+    <title>First post</title>
+    <id>urn:example:post1</id>
+    <link href="post1.html"/>
+    <published>2023-11-06T10:15:00Z</published>
+    <summary type="html">&lt;p&gt;&lt;a href="post1.html"&gt;Read&lt;/a&gt;
+      &lt;img alt="a" src="img/a.png" /&gt;&lt;/p&gt;</summary>
+  </entry>
+</feed>
+""",
+        encoding=encoding,
+    )
+    feed_sensor = FeedParserSensor(
+        feed=feed_path.absolute().as_uri(),
+        name="xml_base",
+        date_format=DATE_FORMAT,
+        local_time=False,
+        show_topn=9999,
+        remove_summary_image=False,
+        inclusions=["image", "title", "link", "published", "summary"],
+        exclusions=[],
+        scan_interval=DEFAULT_SCAN_INTERVAL,
+    )
+    feed_sensor.update()
+    entry = feed_sensor.feed_entries[0]
+    assert entry["link"] == "https://cdn.example.org/blog/post1.html"
+    assert entry["image"] == "https://cdn.example.org/blog/img/a.png"
+    assert 'href="https://cdn.example.org/blog/post1.html"' in entry["summary"]